@@ -0,0 +1,86 @@
+"""
+ASGI application for GroupTransferBot: health endpoint + bot lifespan
+
+Importing this module only defines the app; the bot starts in the lifespan.
+Serve it with run_bot.py or any ASGI server (e.g. gunicorn asgi:app).
+"""
+
+import asyncio
+import importlib
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+BOT_SHUTDOWN_TIMEOUT = 5  # seconds to wait for the bot task after cancelling it
+
+def configure_logging():
+    """One root handler shared by the launcher, uvicorn (log_config=None) and the bot"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+# ----------------------------
+# FastAPI Lifespan (startup/shutdown)
+# ----------------------------
+def on_bot_done(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.error("❌ Error running bot: %s", task.exception(), exc_info=task.exception())
+
+async def start_bot():
+    # Importing aiogram/Telethon blocks, so do it in a worker thread to keep
+    # health checks answered; run_bot builds the bot off the loop as well
+    bot_module = await run_in_threadpool(importlib.import_module, "group_transfer_bot")
+    await bot_module.run_bot(handle_signals=False)
+
+async def on_startup_handler(app: FastAPI):
+    # No-op when run_bot.py already configured logging
+    configure_logging()
+    logger.info("🚀 Bot starting up...")
+
+    # Run the bot on uvicorn's event loop; uvicorn keeps signal handling
+    app.state.bot_task = asyncio.create_task(start_bot())
+    app.state.bot_task.add_done_callback(on_bot_done)
+
+async def on_shutdown_handler(app: FastAPI):
+    logger.info("🛑 Bot shutting down...")
+    bot_task = app.state.bot_task
+    bot_task.cancel()
+    done, _ = await asyncio.wait({bot_task}, timeout=BOT_SHUTDOWN_TIMEOUT)
+    if not done:
+        logger.warning("Bot did not stop within %s seconds", BOT_SHUTDOWN_TIMEOUT)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await on_startup_handler(app)
+    yield
+    await on_shutdown_handler(app)
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Health payload never changes, so serialize it and build the response once at import
+HEALTH_BODY = ORJSONResponse({"status": "ok", "message": "GroupTransferBot is running ✅"}).body
+HEALTH_RESPONSE = Response(content=HEALTH_BODY, media_type="application/json", headers={"cache-control": "no-store"})
+
+HEALTH_HEAD_RESPONSE = Response(status_code=200, headers={"cache-control": "no-store"})
+
+# Served once the bot task has stopped, so the platform restarts the service
+BOT_DOWN_BODY = ORJSONResponse({"status": "error", "message": "GroupTransferBot is not running ❌"}).body
+BOT_DOWN_RESPONSE = Response(content=BOT_DOWN_BODY, status_code=503, media_type="application/json", headers={"cache-control": "no-store"})
+BOT_DOWN_HEAD_RESPONSE = Response(status_code=503, headers={"cache-control": "no-store"})
+
+def bot_running() -> bool:
+    bot_task = getattr(app.state, "bot_task", None)
+    return bot_task is not None and not bot_task.done()
+
+@app.get("/")
+async def root():
+    return HEALTH_RESPONSE if bot_running() else BOT_DOWN_RESPONSE
+
+@app.head("/")
+async def root_head():
+    return HEALTH_HEAD_RESPONSE if bot_running() else BOT_DOWN_HEAD_RESPONSE
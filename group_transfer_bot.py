@@ -9,33 +9,28 @@ Features:
 """
 
 import asyncio
+import atexit
 import logging
 import sqlite3
+import threading
 import json
+import random
 import os
-from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Union
 import time
 
 from aiogram import Bot, Dispatcher, types, F
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message, CallbackQuery
-from aiogram.filters import Command, CommandStart
-from aiogram.fsm.context import FSMContext
-from aiogram.fsm.state import State, StatesGroup
+from aiogram.filters import Command, CommandObject, CommandStart
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.exceptions import TelegramAPIError
+from aiolimiter import AsyncLimiter
 
 from telethon import TelegramClient
 from telethon.errors import FloodWaitError, ChatAdminRequiredError, UserPrivacyRestrictedError
-from telethon.tl.types import User, Chat, Channel
-from telethon.tl.functions.channels import InviteToChannelRequest, GetParticipantsRequest
-from telethon.tl.types import ChannelParticipantsSearch
+from telethon.tl.types import User, Chat, Channel, InputPeerUser
+from telethon.tl.functions.channels import InviteToChannelRequest
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Bot configuration
@@ -52,26 +47,57 @@ CONTACT_ADMIN_USERNAME = "@thegodoftgbot"
 TRANSFER_DELAY = 10  # seconds between invites
 MAX_RETRIES = 3
 FLOOD_WAIT_THRESHOLD = 3600  # 1 hour max wait
+BOT_MESSAGES_PER_SECOND = 25  # stays under Telegram's 30 msg/s bot limit
+
+# Persistence configuration
+SESSION_FLUSH_INTERVAL = 50  # invites between transfer_sessions updates
 
-class TransferStates(StatesGroup):
-    waiting_source_id = State()
-    waiting_target_id = State()
-    confirming_transfer = State()
+# Transfer report templates
+PROGRESS_TEMPLATE = (
+    "📊 **Progress Update**\n\n"
+    "✅ Transferred: {transferred}\n"
+    "❌ Failed: {failed}\n"
+    "📈 Progress: {processed}/{total}"
+)
+FINAL_REPORT_TEMPLATE = (
+    "🎉 **Transfer Complete!**\n\n"
+    "📊 **Final Statistics:**\n"
+    "✅ Successfully transferred: {transferred}\n"
+    "❌ Failed transfers: {failed}\n"
+    "📈 Total processed: {total}\n"
+    "⏰ Completed at: {completed_at}\n\n"
+    "⚠️ **Note:** Failed transfers may be due to user privacy settings or admin restrictions."
+)
 
 class GroupTransferBot:
     def __init__(self):
         self.bot = Bot(token=BOT_TOKEN)
         self.dp = Dispatcher(storage=MemoryStorage())
+        self.limiter = AsyncLimiter(BOT_MESSAGES_PER_SECOND, 1)
         self.client: Optional[TelegramClient] = None
+        self._client_lock = asyncio.Lock()
         self.transfer_tasks: Dict[int, asyncio.Task] = {}
+        self.pending_transfers: Dict[int, Dict[str, Optional[str]]] = {}
         self.db_path = "bot_data.db"
+        self.conn: Optional[sqlite3.Connection] = None
+        self.db_lock = threading.Lock()
+        self._admin_ids: set[int] = set()
         self.init_database()
         self.setup_handlers()
         
     def init_database(self):
         """Initialize SQLite database for storing bot data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Single long-lived connection shared by all handlers
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.conn.executescript('''
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=memory;
+            PRAGMA cache_size=-20000;
+            PRAGMA busy_timeout=5000;
+        ''')
+        atexit.register(self.close_database)
+        cursor = self.conn.cursor()
         
         # Admins table
         cursor.execute('''
@@ -100,63 +126,103 @@ class GroupTransferBot:
             )
         ''')
         
-        # Add default admin if ADMIN_IDS is provided
-        for admin_id in ADMIN_IDS:
-            cursor.execute('''
+        # Add default admins if ADMIN_IDS is provided (single transaction)
+        if ADMIN_IDS:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany('''
                 INSERT OR IGNORE INTO admins (user_id, username, first_name, added_by)
                 VALUES (?, ?, ?, ?)
-            ''', (admin_id, "default_admin", "Default Admin", admin_id))
+            ''', [(admin_id, "default_admin", "Default Admin", admin_id) for admin_id in ADMIN_IDS])
+            self.conn.commit()
+        
+        # Cache admin IDs in memory; SQLite is only used for persistence
+        cursor.execute("SELECT user_id FROM admins")
+        self._admin_ids = {row[0] for row in cursor.fetchall()}
         
-        conn.commit()
-        conn.close()
+    def close_database(self):
+        """Checkpoint the WAL file and close the shared connection"""
+        with self.db_lock:
+            if self.conn is None:
+                return
+            try:
+                # TRUNCATE resets the -wal file to zero bytes so the next start has nothing to replay
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                self.conn.close()
+                self.conn = None
+            
+    def _fetchall(self, query: str, params: tuple = ()) -> List[tuple]:
+        """Run a read query on the shared connection"""
+        with self.db_lock:
+            return self.conn.execute(query, params).fetchall()
+            
+    def _execute(self, query: str, params: tuple = ()) -> Optional[int]:
+        """Run a write query on the shared connection and return the last row ID"""
+        with self.db_lock:
+            return self.conn.execute(query, params).lastrowid
         
     def is_admin(self, user_id: int) -> bool:
         """Check if user is admin"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1 FROM admins WHERE user_id = ?", (user_id,))
-        result = cursor.fetchone() is not None
-        conn.close()
-        return result
+        return user_id in self._admin_ids
         
-    def add_admin(self, user_id: int, username: Optional[str] = None, first_name: Optional[str] = None, added_by: Optional[int] = None):
+    async def add_admin(self, user_id: int, username: Optional[str] = None, first_name: Optional[str] = None, added_by: Optional[int] = None):
         """Add new admin to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        await asyncio.to_thread(self._execute, '''
             INSERT OR REPLACE INTO admins (user_id, username, first_name, added_by)
             VALUES (?, ?, ?, ?)
         ''', (user_id, username, first_name, added_by))
-        conn.commit()
-        conn.close()
+        self._admin_ids.add(user_id)
         
-    def remove_admin(self, user_id: int):
+    async def remove_admin(self, user_id: int):
         """Remove admin from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM admins WHERE user_id = ?", (user_id,))
-        conn.commit()
-        conn.close()
+        await asyncio.to_thread(self._execute, "DELETE FROM admins WHERE user_id = ?", (user_id,))
+        self._admin_ids.discard(user_id)
         
-    def get_all_admins(self) -> List[Dict]:
+    async def get_all_admins(self) -> List[Dict]:
         """Get all admins from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        rows = await asyncio.to_thread(self._fetchall, '''
             SELECT user_id, username, first_name, added_at 
             FROM admins ORDER BY added_at
         ''')
         admins = []
-        for row in cursor.fetchall():
+        for row in rows:
             admins.append({
                 'user_id': row[0],
                 'username': row[1],
                 'first_name': row[2],
                 'added_at': row[3]
             })
-        conn.close()
         return admins
         
+    async def create_transfer_session(self, admin_id: int, source_chat_id: str, target_chat_id: str, total_members: int) -> int:
+        """Record a running transfer session and return its ID"""
+        return await asyncio.to_thread(self._execute, '''
+            INSERT INTO transfer_sessions (admin_id, source_chat_id, target_chat_id, status, total_members)
+            VALUES (?, ?, ?, 'running', ?)
+        ''', (admin_id, source_chat_id, target_chat_id, total_members))
+        
+    async def update_transfer_session(self, session_id: int, transferred: int, failed: int, status: Optional[str] = None):
+        """Flush transfer counters, marking the session finished when status is given"""
+        if status is None:
+            await asyncio.to_thread(self._execute, '''
+                UPDATE transfer_sessions SET transferred_members = ?, failed_members = ?
+                WHERE id = ?
+            ''', (transferred, failed, session_id))
+        else:
+            await asyncio.to_thread(self._execute, '''
+                UPDATE transfer_sessions SET transferred_members = ?, failed_members = ?,
+                    status = ?, completed_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (transferred, failed, status, session_id))
+        
+    def pending_transfer(self, admin_id: int) -> Dict[str, Optional[str]]:
+        """Get (or start) the transfer setup for an admin; 'awaiting' names the chat ID expected next"""
+        return self.pending_transfers.setdefault(admin_id, {
+            'source': None,
+            'target': None,
+            'awaiting': None
+        })
+        
     def admin_only_keyboard(self):
         """Create keyboard with contact admin button for non-admins"""
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -177,10 +243,16 @@ class GroupTransferBot:
         
     async def init_telethon_client(self):
         """Initialize Telethon client for user operations"""
-        if not self.client:
-            self.client = TelegramClient(SESSION_STRING, API_ID, API_HASH)
-            await self.client.start()
-            logger.info("Telethon client initialized")
+        if self.client:
+            return
+            
+        # Double-checked so concurrent transfers start the client only once
+        async with self._client_lock:
+            if not self.client:
+                client = TelegramClient(SESSION_STRING, API_ID, API_HASH)
+                await client.start()
+                self.client = client
+                logger.info("Telethon client initialized")
             
     def setup_handlers(self):
         """Setup all bot handlers"""
@@ -212,7 +284,7 @@ class GroupTransferBot:
                 )
                 
         @self.dp.message(Command("scrapemembers"))
-        async def scrape_members_command(message: Message, state: FSMContext):
+        async def scrape_members_command(message: Message):
             """Handle /scrapemembers command"""
             if not message.from_user:
                 return
@@ -224,12 +296,8 @@ class GroupTransferBot:
                 )
                 return
                 
-            await state.clear()
-            await state.set_data({
-                'source_chat_id': None,
-                'target_chat_id': None,
-                'admin_id': message.from_user.id
-            })
+            # Start a fresh setup; it is created again on the first button press
+            self.pending_transfers.pop(message.from_user.id, None)
             
             text = (
                 "🔄 **Member Transfer Setup**\n\n"
@@ -242,12 +310,16 @@ class GroupTransferBot:
             await message.reply(text, reply_markup=self.transfer_control_keyboard(), parse_mode="Markdown")
             
         @self.dp.callback_query(F.data == "fetch_from")
-        async def fetch_from_callback(callback: CallbackQuery, state: FSMContext):
+        async def fetch_from_callback(callback: CallbackQuery):
             """Handle fetch from button"""
             if not callback.message:
                 return
                 
-            await state.set_state(TransferStates.waiting_source_id)
+            if not self.is_admin(callback.from_user.id):
+                await callback.answer("❌ This command is for admins only.", show_alert=True)
+                return
+                
+            self.pending_transfer(callback.from_user.id)['awaiting'] = 'source'
             await callback.message.edit_text(
                 "📥 **Set Source Group**\n\n"
                 "Please send the chat ID of the group/channel you want to fetch members FROM.\n"
@@ -257,12 +329,16 @@ class GroupTransferBot:
             await callback.answer()
             
         @self.dp.callback_query(F.data == "push_to")
-        async def push_to_callback(callback: CallbackQuery, state: FSMContext):
+        async def push_to_callback(callback: CallbackQuery):
             """Handle push to button"""
             if not callback.message:
                 return
                 
-            await state.set_state(TransferStates.waiting_target_id)
+            if not self.is_admin(callback.from_user.id):
+                await callback.answer("❌ This command is for admins only.", show_alert=True)
+                return
+                
+            self.pending_transfer(callback.from_user.id)['awaiting'] = 'target'
             await callback.message.edit_text(
                 "📤 **Set Target Group**\n\n"
                 "Please send the chat ID of the group/channel you want to push members TO.\n"
@@ -271,91 +347,94 @@ class GroupTransferBot:
             )
             await callback.answer()
             
-        @self.dp.message(TransferStates.waiting_source_id)
-        async def handle_source_id(message: Message, state: FSMContext):
-            """Handle source chat ID input"""
+        def awaiting_chat_id(message: Message) -> bool:
+            """Match messages from an admin who was asked for a chat ID"""
+            if not message.from_user:
+                return False
+            pending = self.pending_transfers.get(message.from_user.id)
+            return bool(pending and pending['awaiting'])
+            
+        @self.dp.message(awaiting_chat_id)
+        async def handle_chat_id(message: Message):
+            """Handle source/target chat ID input"""
             if not message.text:
                 return
                 
-            # Read existing FSM data (if any)
-            data = await state.get_data()
-
-            # Save source chat id (do not clear state here)
-            data['source_chat_id'] = message.text.strip()
-            await state.set_data(data)
-
-            await message.reply(
-                f"✅ Source set to: `{message.text.strip()}`\n\n"
-                "Now configure the target using the buttons above.",
-                reply_markup=self.transfer_control_keyboard(),
-                parse_mode="Markdown"
-            )
-
-            # DO NOT clear the FSM here — wait until transfer starts (Done is pressed)
-
+            pending = self.pending_transfers[message.from_user.id]
+            chat_id = message.text.strip()
+            
+            # Keep the setup until Done is pressed
+            if pending['awaiting'] == 'source':
+                pending['source'] = chat_id
+                text = (
+                    f"✅ Source set to: `{chat_id}`\n\n"
+                    "Now configure the target using the buttons above."
+                )
+            else:
+                pending['target'] = chat_id
+                text = (
+                    f"✅ Target set to: `{chat_id}`\n\n"
+                    "Click Done when ready to start the transfer."
+                )
+            pending['awaiting'] = None
             
-        @self.dp.message(TransferStates.waiting_target_id)
-        async def handle_target_id(message: Message, state: FSMContext):
-            """Handle target chat ID input"""
-            if not message.text:
-                return
-
-            data = await state.get_data()
-            data['target_chat_id'] = message.text.strip()
-            await state.set_data(data)
-
             await message.reply(
-                f"✅ Target set to: `{message.text.strip()}`\n\n"
-                "Click Done when ready to start the transfer.",
+                text,
                 reply_markup=self.transfer_control_keyboard(),
                 parse_mode="Markdown"
             )
-
-            # Do NOT clear state here either — Done should clear it after starting transfer
-
             
         @self.dp.callback_query(F.data == "done_setup")
-        async def done_setup_callback(callback: CallbackQuery, state: FSMContext):
+        async def done_setup_callback(callback: CallbackQuery):
             """Handle done setup button"""
             if not callback.message:
                 return
 
-            # Read FSM data (should contain source_chat_id, target_chat_id, admin_id)
-            data = await state.get_data()
-            logger.info("DEBUG: FSM data at Done click: %s", data)
+            if not self.is_admin(callback.from_user.id):
+                await callback.answer("❌ This command is for admins only.", show_alert=True)
+                return
 
-            if not data.get('source_chat_id') or not data.get('target_chat_id'):
-                await callback.answer("❌ Please set both source and target groups first!", show_alert=True)
+            admin_id = callback.from_user.id
+            pending = self.pending_transfers.get(admin_id)
+
+            running = self.transfer_tasks.get(admin_id)
+            if running and not running.done():
+                await callback.answer("⏳ A transfer is already running. Please wait for it to finish.", show_alert=True)
                 return
 
-            await callback.message.edit_text(
-                "🚀 Starting Member Transfer\n\n"
-                f"From: {data['source_chat_id']}\n"
-                f"To: {data['target_chat_id']}\n\n"
-                "⏳ Initializing transfer... This may take 5-10 minutes.",
-                parse_mode="Markdown"
-            )
+            if not pending or not pending['source'] or not pending['target']:
+                await callback.answer("❌ Please set both source and target groups first!", show_alert=True)
+                return
 
             # Start transfer task in background so UI returns immediately
             task = asyncio.create_task(
                 self.transfer_members(
-                    data['source_chat_id'],
-                    data['target_chat_id'],
+                    pending['source'],
+                    pending['target'],
                     callback.message.chat.id,
-                    data.get('admin_id')
+                    admin_id
                 )
             )
 
-            # Save task reference so you can cancel / monitor it
-            self.transfer_tasks[callback.message.chat.id] = task
+            # Register before any await so a second Done press sees the running transfer
+            self.transfer_tasks[admin_id] = task
+            task.add_done_callback(lambda t: self.on_transfer_done(admin_id, t))
 
-            await callback.answer()
+            # Setup is consumed now that the transfer is running
+            del self.pending_transfers[admin_id]
+
+            await callback.message.edit_text(
+                "🚀 Starting Member Transfer\n\n"
+                f"From: {pending['source']}\n"
+                f"To: {pending['target']}\n\n"
+                "⏳ Initializing transfer... This may take 5-10 minutes.",
+                parse_mode="Markdown"
+            )
 
-            # NOW clear the FSM state because transfer is running
-            await state.clear()
-           
+            await callback.answer()
+            
         @self.dp.message(Command("promote"))
-        async def promote_command(message: Message):
+        async def promote_command(message: Message, command: CommandObject):
             """Handle /promote command"""
             if not message.from_user or not message.text:
                 return
@@ -368,12 +447,13 @@ class GroupTransferBot:
                 return
                 
             try:
-                parts = message.text.split()
-                if len(parts) != 2:
+                # The Command filter has already split off the arguments
+                args = (command.args or "").split()
+                if len(args) != 1:
                     await message.reply("❌ Usage: `/promote <user_id>`", parse_mode="Markdown")
                     return
                     
-                user_id = int(parts[1])
+                user_id = int(args[0])
                 
                 # Try to get user info
                 try:
@@ -384,7 +464,7 @@ class GroupTransferBot:
                     username = "N/A"
                     first_name = "N/A"
                     
-                self.add_admin(user_id, username, first_name, message.from_user.id)
+                await self.add_admin(user_id, username, first_name, message.from_user.id)
                 
                 await message.reply(
                     f"✅ **User promoted to admin**\n\n"
@@ -400,7 +480,7 @@ class GroupTransferBot:
                 await message.reply(f"❌ Error promoting user: {str(e)}")
                 
         @self.dp.message(Command("remove"))
-        async def remove_command(message: Message):
+        async def remove_command(message: Message, command: CommandObject):
             """Handle /remove command"""
             if not message.from_user or not message.text:
                 return
@@ -413,18 +493,19 @@ class GroupTransferBot:
                 return
                 
             try:
-                parts = message.text.split()
-                if len(parts) != 2:
+                # The Command filter has already split off the arguments
+                args = (command.args or "").split()
+                if len(args) != 1:
                     await message.reply("❌ Usage: `/remove <user_id>`", parse_mode="Markdown")
                     return
                     
-                user_id = int(parts[1])
+                user_id = int(args[0])
                 
                 if not self.is_admin(user_id):
                     await message.reply("❌ User is not an admin.")
                     return
                     
-                self.remove_admin(user_id)
+                await self.remove_admin(user_id)
                 
                 await message.reply(
                     f"✅ **Admin removed**\n\n"
@@ -450,7 +531,7 @@ class GroupTransferBot:
                 )
                 return
                 
-            admins = self.get_all_admins()
+            admins = await self.get_all_admins()
             
             if not admins:
                 await message.reply("❌ No admins found.")
@@ -484,18 +565,16 @@ class GroupTransferBot:
             await message.reply("🔄 **Bot refreshed successfully!**\n\nAll systems operational.", parse_mode="Markdown")
             
         # Handle non-admin attempts for other commands
-        @self.dp.message()
+        @self.dp.message(F.text.startswith('/'))
         async def handle_unknown(message: Message):
             """Handle unknown commands from non-admins"""
-            if not message.from_user or not message.text:
+            if not message.from_user or message.from_user.id in self._admin_ids:
                 return
                 
-            if message.text.startswith('/'):
-                if not self.is_admin(message.from_user.id):
-                    await message.reply(
-                        "❌ This command is for admins only.",
-                        reply_markup=self.admin_only_keyboard()
-                    )
+            await message.reply(
+                "❌ This command is for admins only.",
+                reply_markup=self.admin_only_keyboard()
+            )
                     
     async def get_chat_members(self, chat_id: str) -> List[Dict]:
         """Get all members from a chat using Telethon"""
@@ -510,20 +589,12 @@ class GroupTransferBot:
             title = getattr(entity, 'title', chat_id)
             logger.info(f"Getting members from chat: {title}")
             
-            members = []
-            offset = 0
-            limit = 100
-            
-            while True:
+            for attempt in range(MAX_RETRIES):
+                members = []
+                
                 try:
-                    participants = await self.client(GetParticipantsRequest(
-                        entity, ChannelParticipantsSearch(''), offset, limit, hash=0
-                    ))
-                    
-                    if not hasattr(participants, 'users') or not participants.users:
-                        break
-                        
-                    for user in participants.users:
+                    # Telethon pages the participant list and sleeps through short flood waits itself
+                    async for user in self.client.iter_participants(entity):
                         if isinstance(user, User) and not user.bot and not user.deleted:
                             members.append({
                                 'id': user.id,
@@ -532,17 +603,14 @@ class GroupTransferBot:
                                 'last_name': user.last_name,
                                 'access_hash': user.access_hash
                             })
-                    
-                    offset += len(participants.users)
-                    
-                    # Rate limiting
-                    await asyncio.sleep(1)
+                    break
                     
                 except FloodWaitError as e:
-                    logger.warning(f"Flood wait: {e.seconds} seconds")
-                    if e.seconds > FLOOD_WAIT_THRESHOLD:
-                        raise Exception(f"Flood wait too long: {e.seconds} seconds")
-                    await asyncio.sleep(e.seconds)
+                    # Longer waits: back off with jitter and restart the listing from scratch
+                    if e.seconds > FLOOD_WAIT_THRESHOLD or attempt == MAX_RETRIES - 1:
+                        raise
+                    logger.warning(f"Flood wait: {e.seconds} seconds (attempt {attempt + 1}/{MAX_RETRIES})")
+                    await asyncio.sleep(e.seconds + random.uniform(0, 2 ** attempt))
                     
             logger.info(f"Found {len(members)} members")
             return members
@@ -551,8 +619,43 @@ class GroupTransferBot:
             logger.error(f"Error getting chat members: {str(e)}")
             raise
             
+    async def _send(self, chat_id: int, text: str, **kwargs) -> Message:
+        """Send a message through the shared bot rate limiter"""
+        async with self.limiter:
+            return await self.bot.send_message(chat_id, text, **kwargs)
+            
+    async def edit_status(self, status_msg: Message, text: str):
+        """Edit the transfer status message in place"""
+        try:
+            async with self.limiter:
+                await self.bot.edit_message_text(
+                    text,
+                    chat_id=status_msg.chat.id,
+                    message_id=status_msg.message_id,
+                    parse_mode="Markdown"
+                )
+        except TelegramAPIError as e:
+            if "message is not modified" not in str(e):
+                logger.warning(f"Failed to update status message: {str(e)}")
+                
+    async def invite_with_retry(self, target_entity, user):
+        """Invite a single user, retrying flood waits with exponential jittered backoff"""
+        for attempt in range(MAX_RETRIES):
+            try:
+                await self.client(InviteToChannelRequest(target_entity, [user]))
+                return
+            except FloodWaitError as e:
+                if e.seconds > FLOOD_WAIT_THRESHOLD or attempt == MAX_RETRIES - 1:
+                    raise
+                logger.warning(f"Flood wait: {e.seconds} seconds (attempt {attempt + 1}/{MAX_RETRIES})")
+                await asyncio.sleep(e.seconds + random.uniform(0, 2 ** attempt))
+                
     async def transfer_members(self, source_chat_id: str, target_chat_id: str, notification_chat_id: int, admin_id: int):
         """Transfer members from source to target chat"""
+        session_id = None
+        transferred = 0
+        failed = 0
+        
         try:
             await self.init_telethon_client()
             
@@ -560,7 +663,7 @@ class GroupTransferBot:
                 raise Exception("Failed to initialize Telethon client")
             
             # Notify start
-            await self.bot.send_message(
+            await self._send(
                 notification_chat_id,
                 "🔍 **Fetching members from source group...**",
                 parse_mode="Markdown"
@@ -570,14 +673,15 @@ class GroupTransferBot:
             members = await self.get_chat_members(source_chat_id)
             
             if not members:
-                await self.bot.send_message(
+                await self._send(
                     notification_chat_id,
                     "❌ **No members found in source group.**",
                     parse_mode="Markdown"
                 )
                 return
                 
-            await self.bot.send_message(
+            # Single status message that is edited with progress updates
+            status_msg = await self._send(
                 notification_chat_id,
                 f"📊 **Found {len(members)} members**\n\n🚀 Starting transfer process...",
                 parse_mode="Markdown"
@@ -586,43 +690,35 @@ class GroupTransferBot:
             # Get target entity
             target_entity = await self.client.get_entity(target_chat_id)
             
-            transferred = 0
-            failed = 0
+            session_id = await self.create_transfer_session(admin_id, source_chat_id, target_chat_id, len(members))
             
             # Transfer members one by one
             for i, member in enumerate(members):
                 try:
-                    # Create user entity
-                    user = await self.client.get_entity(member['id'])
+                    # Build the input peer from the scraped access hash to skip a resolve RPC
+                    if member.get('access_hash') is not None:
+                        user = InputPeerUser(user_id=member['id'], access_hash=member['access_hash'])
+                    else:
+                        user = await self.client.get_entity(member['id'])
                     
                     # Invite user to target group
-                    await self.client(InviteToChannelRequest(
-                        target_entity,
-                        [user]
-                    ))
+                    await self.invite_with_retry(target_entity, user)
                     
                     transferred += 1
                     logger.info(f"Transferred user {member['id']} ({member.get('username', 'N/A')})")
                     
-                    # Send progress update every 10 transfers
+                    # Update progress every 10 transfers
                     if (i + 1) % 10 == 0:
-                        await self.bot.send_message(
-                            notification_chat_id,
-                            f"📊 **Progress Update**\n\n"
-                            f"✅ Transferred: {transferred}\n"
-                            f"❌ Failed: {failed}\n"
-                            f"📈 Progress: {i + 1}/{len(members)}",
-                            parse_mode="Markdown"
-                        )
+                        await self.edit_status(status_msg, PROGRESS_TEMPLATE.format(
+                            transferred=transferred,
+                            failed=failed,
+                            processed=i + 1,
+                            total=len(members)
+                        ))
                     
                 except FloodWaitError as e:
-                    logger.warning(f"Flood wait for user {member['id']}: {e.seconds} seconds")
-                    if e.seconds > FLOOD_WAIT_THRESHOLD:
-                        failed += 1
-                        continue
-                    await asyncio.sleep(e.seconds)
-                    # Retry the same user
-                    continue
+                    logger.warning(f"Giving up on user {member['id']} after flood wait of {e.seconds} seconds")
+                    failed += 1
                     
                 except (ChatAdminRequiredError, UserPrivacyRestrictedError) as e:
                     logger.warning(f"Cannot invite user {member['id']}: {str(e)}")
@@ -632,47 +728,59 @@ class GroupTransferBot:
                     logger.error(f"Error transferring user {member['id']}: {str(e)}")
                     failed += 1
                     
+                # Persist counters in batches rather than once per invite
+                if (i + 1) % SESSION_FLUSH_INTERVAL == 0:
+                    await self.update_transfer_session(session_id, transferred, failed)
+                    
                 # Rate limiting between invites
                 await asyncio.sleep(TRANSFER_DELAY)
                 
+            await self.update_transfer_session(session_id, transferred, failed, status='completed')
+            
             # Final report
-            completion_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            final_message = (
-                f"🎉 **Transfer Complete!**\n\n"
-                f"📊 **Final Statistics:**\n"
-                f"✅ Successfully transferred: {transferred}\n"
-                f"❌ Failed transfers: {failed}\n"
-                f"📈 Total processed: {len(members)}\n"
-                f"⏰ Completed at: {completion_time}\n\n"
-                f"⚠️ **Note:** Failed transfers may be due to user privacy settings or admin restrictions."
+            final_message = FINAL_REPORT_TEMPLATE.format(
+                transferred=transferred,
+                failed=failed,
+                total=len(members),
+                completed_at=time.strftime("%Y-%m-%d %H:%M:%S")
             )
             
-            await self.bot.send_message(
+            await self._send(
                 notification_chat_id,
                 final_message,
                 parse_mode="Markdown"
             )
             
+        except asyncio.CancelledError:
+            if session_id is not None:
+                await self.update_transfer_session(session_id, transferred, failed, status='cancelled')
+            raise
+            
         except Exception as e:
+            if session_id is not None:
+                await self.update_transfer_session(session_id, transferred, failed, status='failed')
+                
             error_message = (
                 f"❌ **Transfer Failed**\n\n"
                 f"**Error:** {str(e)}\n\n"
                 f"Please check the chat IDs and try again."
             )
             
-            await self.bot.send_message(
+            await self._send(
                 notification_chat_id,
                 error_message,
                 parse_mode="Markdown"
             )
             
-        finally:
-            # Clean up task reference
-            if notification_chat_id in self.transfer_tasks:
-                del self.transfer_tasks[notification_chat_id]
-                
-    async def run(self):
+    def on_transfer_done(self, admin_id: int, task: asyncio.Task):
+        """Clean up a finished transfer task and log any error it raised"""
+        if self.transfer_tasks.get(admin_id) is task:
+            del self.transfer_tasks[admin_id]
+            
+        if not task.cancelled() and task.exception():
+            logger.error("Transfer task failed", exc_info=task.exception())
+            
+    async def run(self, handle_signals: bool = True):
         """Start the bot"""
         logger.info("Starting GroupTransferBot...")
         
@@ -683,18 +791,62 @@ class GroupTransferBot:
             raise ValueError("API_ID and API_HASH environment variables are required")
             
         try:
-            await self.dp.start_polling(self.bot)
+            await self.dp.start_polling(self.bot, handle_signals=handle_signals)
         except Exception as e:
             logger.error(f"Error running bot: {e}")
             raise
         finally:
+            # Stop running transfers (and any flood-wait sleeps) before tearing down
+            for task in list(self.transfer_tasks.values()):
+                task.cancel()
+            await asyncio.gather(*self.transfer_tasks.values(), return_exceptions=True)
+            
             if self.client:
                 await self.client.disconnect()
+            await asyncio.to_thread(self.close_database)
+
+def close_abandoned_bot(build: asyncio.Future):
+    """Close the database of a bot whose start-up was cancelled mid-build"""
+    if not build.cancelled() and build.exception() is None:
+        build.result().close_database()
+
+async def run_bot(handle_signals: bool = True):
+    """Build the bot and poll until cancelled
+
+    Pass handle_signals=False when embedding in another server (e.g. uvicorn)
+    that owns SIGINT/SIGTERM handling.
+    """
+    # The constructor opens SQLite, so build off the event loop
+    build = asyncio.ensure_future(asyncio.to_thread(GroupTransferBot))
+    try:
+        bot = await asyncio.shield(build)
+    except asyncio.CancelledError:
+        # The worker thread cannot be interrupted; clean up whatever it builds
+        build.add_done_callback(close_abandoned_bot)
+        raise
+        
+    await bot.run(handle_signals=handle_signals)
 
 async def main():
     """Main function"""
-    bot = GroupTransferBot()
-    await bot.run()
+    await run_bot()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Configure logging here so importing the module (e.g. from run_bot) has no side effects
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    # Prefer uvloop when it is installed (it ships with uvicorn[standard]);
+    # uvloop.run only exists from 0.18, older versions fall back to asyncio
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+        
+    if uvloop is not None and hasattr(uvloop, "run"):
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
+
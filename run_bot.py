@@ -3,60 +3,60 @@
 Simple runner script for GroupTransferBot with FastAPI + Render fixes
 """
 
-import subprocess
-import sys
+import asyncio
+import logging
 import os
 import uvicorn
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
 
-# ----------------------------
-# FastAPI Lifespan (startup/shutdown)
-# ----------------------------
-async def on_startup_handler():
-    print("🚀 Bot starting up...")
-
-async def on_shutdown_handler():
-    print("🛑 Bot shutting down...")
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    await on_startup_handler()
-    yield
-    await on_shutdown_handler()
+from asgi import app, configure_logging
 
-app = FastAPI(lifespan=lifespan)
+logger = logging.getLogger("run_bot")
 
-@app.get("/")
-async def root():
-    return {"status": "ok", "message": "GroupTransferBot is running ✅"}
+# Server configuration (read once at import)
+PORT = int(os.environ.get("PORT", 10000))
 
 # ----------------------------
 # Main runner
 # ----------------------------
+async def serve(port: int):
+    """Serve the app on the current event loop"""
+    config = uvicorn.Config(app, host="0.0.0.0", port=port, http="auto", log_level="info", log_config=None)
+    server = uvicorn.Server(config)
+    await server.serve()
+
 def main():
     """Run the GroupTransferBot"""
-    print("🤖 Starting GroupTransferBot...")
-    print("📋 Make sure you have set all required environment variables:")
-    print("   - BOT_TOKEN")
-    print("   - API_ID") 
-    print("   - API_HASH")
-    print("   - ADMIN_IDS")
-    print("   - SESSION_STRING (optional)")
-    print()
+    configure_logging()
+    logger.info(
+        "🤖 Starting GroupTransferBot...\n"
+        "📋 Make sure you have set all required environment variables:\n"
+        "   - BOT_TOKEN\n"
+        "   - API_ID\n"
+        "   - API_HASH\n"
+        "   - ADMIN_IDS\n"
+        "   - SESSION_STRING (optional)"
+    )
     
     try:
-        # Run the bot script as subprocess
-        subprocess.Popen([sys.executable, "group_transfer_bot.py"])
-
-        # Start FastAPI server (Render requires this)
-        port = int(os.environ.get("PORT", 10000))
-        uvicorn.run("run_bot:app", host="0.0.0.0", port=port, reload=False)
+        # Start FastAPI server (Render requires this); the bot runs inside its lifespan.
+        # Prefer uvloop; uvloop.run only exists from 0.18, otherwise fall back to asyncio
+        if uvloop is not None and hasattr(uvloop, "run"):
+            uvloop.run(serve(PORT))
+        else:
+            asyncio.run(serve(PORT))
 
     except KeyboardInterrupt:
-        print("\n🛑 Bot stopped by user")
-    except Exception as e:
-        print(f"❌ Error running bot: {e}")
+        logger.info("🛑 Bot stopped by user")
+    except SystemExit as e:
+        # uvicorn logs start-up failures (e.g. port already in use) and exits non-zero itself
+        if e.code:
+            logger.error(f"❌ Server exited with code {e.code}")
+        raise
 
 if __name__ == "__main__":
     main()